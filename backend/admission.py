@@ -0,0 +1,183 @@
+# admission.py
+
+"""
+🚦 Admission Control – LLM Request Queue
+----------------------------------------
+The local Ollama model only serves a few generations at once.
+This module puts a priority queue in front of it:
+
+- interactive (UI) requests are served ahead of batch jobs
+- queue depth and estimated wait are tracked from observed generation latency
+- when the estimated wait is too long, callers are told to degrade
+  (serve cached or rule-engine SQL instead of waiting)
+- when the queue is full, callers are rejected with a Retry-After hint;
+  a higher-priority request takes the place of the newest lower-priority waiter
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ⚙️ Limits (override via environment)
+# At the initial 5s latency estimate, 8 waiting requests mean ~25s of wait,
+# under the 30s threshold, so a burst fills the queue (429) before shedding starts.
+# Slower observed generations push the estimate past 30s first, and then
+# requests are shed to cached/rule SQL.
+LLM_CONCURRENCY = int(os.environ.get("BLISS_LLM_CONCURRENCY", "2"))
+LLM_MAX_QUEUE = int(os.environ.get("BLISS_LLM_MAX_QUEUE", "8"))
+LLM_MAX_WAIT_S = float(os.environ.get("BLISS_LLM_MAX_WAIT_S", "30"))
+LLM_INITIAL_LATENCY_S = float(os.environ.get("BLISS_LLM_INITIAL_LATENCY_S", "5"))
+
+# 🏷️ Lower number = served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+class QueueFull(Exception):
+    """Queue is at capacity – reject the request (HTTP 429)."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"LLM queue full, retry after {retry_after:.0f}s")
+
+
+class ShedLoad(Exception):
+    """Estimated wait exceeds the threshold – serve a degraded answer instead."""
+
+    def __init__(self, estimated_wait: float):
+        self.estimated_wait = estimated_wait
+        super().__init__(f"LLM busy, estimated wait {estimated_wait:.1f}s")
+
+
+class AdmissionController:
+    """
+    Priority queue + concurrency limit around a slow shared resource.
+    Latency is tracked as an exponentially weighted moving average.
+    """
+
+    def __init__(self, concurrency: int = LLM_CONCURRENCY, max_queue: int = LLM_MAX_QUEUE,
+                 max_wait_s: float = LLM_MAX_WAIT_S, initial_latency_s: float = LLM_INITIAL_LATENCY_S,
+                 smoothing: float = 0.2):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.smoothing = smoothing
+        self.avg_latency_s = initial_latency_s
+
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, seq)
+        self._evicted = set()  # tickets bumped from a full queue by higher-priority requests
+        self._seq = itertools.count()
+        self._active = 0
+        self._stats = {"admitted": 0, "shed": 0, "rejected": 0}
+
+    # 📏 Estimates
+    def _estimate_wait(self, ahead: int) -> float:
+        """Seconds until a request with `ahead` requests in front of it starts."""
+        if self._active + ahead < self.concurrency:
+            return 0.0
+        rounds = (self._active + ahead - self.concurrency) // self.concurrency + 1
+        return rounds * self.avg_latency_s
+
+    def estimated_wait(self, priority: str = "interactive") -> float:
+        """Estimated wait for a new request of this priority."""
+        rank = PRIORITIES.get(priority, PRIORITIES["batch"])
+        with self._cond:
+            ahead = sum(1 for p, _ in self._waiting if p <= rank)
+            return self._estimate_wait(ahead)
+
+    def _record_latency(self, seconds: float):
+        self.avg_latency_s = (1 - self.smoothing) * self.avg_latency_s + self.smoothing * seconds
+
+    # 🚦 Admission
+    @contextmanager
+    def slot(self, priority: str = "interactive"):
+        """
+        Hold one LLM slot for the duration of the block.
+        Raises QueueFull or ShedLoad instead of admitting when overloaded.
+        """
+        rank = PRIORITIES.get(priority, PRIORITIES["batch"])
+
+        with self._cond:
+            if len(self._waiting) >= self.max_queue:
+                # Full: bump the newest lowest-priority waiter if the newcomer
+                # outranks it, so batch jobs can't lock interactive users out
+                worst = max(self._waiting)
+                if worst[0] <= rank:
+                    self._stats["rejected"] += 1
+                    raise QueueFull(retry_after=max(1.0, self._estimate_wait(len(self._waiting))))
+                self._waiting.remove(worst)
+                heapq.heapify(self._waiting)
+                self._evicted.add(worst)
+                self._cond.notify_all()
+
+            ahead = sum(1 for p, _ in self._waiting if p <= rank)
+            estimate = self._estimate_wait(ahead)
+            if estimate > self.max_wait_s:
+                self._stats["shed"] += 1
+                raise ShedLoad(estimate)
+
+            ticket = (rank, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            deadline = time.monotonic() + self.max_wait_s
+
+            # Wait until we're first in line and a slot is free
+            while ticket in self._evicted or self._waiting[0] != ticket or self._active >= self.concurrency:
+                if ticket in self._evicted:
+                    self._evicted.discard(ticket)
+                    self._stats["rejected"] += 1
+                    raise QueueFull(retry_after=max(1.0, self._estimate_wait(len(self._waiting))))
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._stats["shed"] += 1
+                    self._cond.notify_all()
+                    raise ShedLoad(self.max_wait_s)
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._waiting)
+            self._active += 1
+            self._stats["admitted"] += 1
+            self._cond.notify_all()
+
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            # Failed calls (e.g. Ollama down) return fast and would drag
+            # the wait estimate toward zero – don't learn from them
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+            raise
+        else:
+            with self._cond:
+                self._active -= 1
+                self._record_latency(time.monotonic() - start)
+                self._cond.notify_all()
+
+    # 📊 Stats
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "concurrency": self.concurrency,
+                "active": self._active,
+                "queue_depth": len(self._waiting),
+                "max_queue": self.max_queue,
+                "avg_latency_s": round(self.avg_latency_s, 2),
+                "estimated_wait_s": round(self._estimate_wait(len(self._waiting)), 2),
+                **self._stats
+            }
+
+
+# 🌐 Shared controller for the local LLM
+llm_admission = AdmissionController()
+
+
+def retry_after_header(error: QueueFull) -> dict:
+    """Retry-After header (whole seconds) for a rejected request."""
+    return {"Retry-After": str(math.ceil(error.retry_after))}
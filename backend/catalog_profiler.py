@@ -0,0 +1,210 @@
+# catalog_profiler.py
+
+"""
+📇 Catalog Profiler – Column Statistics & Sample Values
+--------------------------------------------------------
+Profiles every table in DuckDB (row counts, distinct counts, min/max,
+all values + top-K for categorical columns) and persists the result to
+metadata/catalog_stats.json.
+
+Profiling is incremental: a table is only re-profiled when its
+content signature changed since the last run.
+
+CatalogIndex is the fast in-memory view used by the prompt and the
+rule engine to map question words to real categorical values.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+# 📂 Where profiles are persisted
+CATALOG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "metadata", "catalog_stats.json"))
+
+# ⚙️ Columns with at most this many distinct text values are treated as categorical;
+# all their values are kept for matching, the TOP_K most frequent are shown in prompts
+CATEGORICAL_MAX_DISTINCT = int(os.environ.get("BLISS_CATEGORICAL_MAX_DISTINCT", "50"))
+TOP_K = int(os.environ.get("BLISS_CATALOG_TOP_K", "10"))
+
+# ⚙️ ...and only if values repeat: distinct/non-null at most this ratio
+# (mostly-unique columns like names are identifiers, not categories)
+CATEGORICAL_MAX_RATIO = float(os.environ.get("BLISS_CATEGORICAL_MAX_RATIO", "0.9"))
+
+# Bump when the profile format changes so old profiles are rebuilt
+PROFILE_VERSION = 3
+
+TEXT_TYPES = ("VARCHAR", "TEXT", "STRING", "CHAR")
+
+# Personal data never gets sample values, whatever its cardinality
+PII_COLUMN_SUFFIXES = ("email", "phone", "address")
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_literal(value) -> str:
+    """Quote a value as a SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _table_signature(con, table: str) -> str:
+    """Cheap change detector: row count + order-independent hash of all rows."""
+    ident = _quote_ident(table)
+    try:
+        count, checksum = con.execute(f"SELECT COUNT(*), SUM(hash(t)) FROM {ident} AS t").fetchone()
+    except Exception:
+        # Older DuckDB without row-as-struct references – fall back to row count
+        count, checksum = con.execute(f"SELECT COUNT(*) FROM {ident}").fetchone()[0], None
+    return f"{count}:{checksum}"
+
+
+def _is_categorical(column: str, data_type: str, distinct_count: int, non_null: int) -> bool:
+    if not data_type.upper().startswith(TEXT_TYPES):
+        return False
+    if column.lower().endswith(PII_COLUMN_SUFFIXES):
+        return False
+    return 0 < distinct_count <= CATEGORICAL_MAX_DISTINCT and distinct_count <= non_null * CATEGORICAL_MAX_RATIO
+
+
+def profile_table(con, table: str, top_k: int = TOP_K) -> dict:
+    """
+    Profile one table: row count plus per-column type, distinct/null counts,
+    min/max and (for categorical text columns) every value plus the top-K by frequency.
+    """
+    ident = _quote_ident(table)
+    columns = con.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'main' AND table_name = ? ORDER BY ordinal_position",
+        [table]
+    ).fetchall()
+
+    row_count = con.execute(f"SELECT COUNT(*) FROM {ident}").fetchone()[0]
+
+    profile = {"row_count": row_count, "columns": {}}
+    for column, data_type in columns:
+        col = _quote_ident(column)
+        distinct_count, non_null, min_value, max_value = con.execute(
+            f"SELECT COUNT(DISTINCT {col}), COUNT({col}), "
+            f"MIN({col})::VARCHAR, MAX({col})::VARCHAR FROM {ident}"
+        ).fetchone()
+
+        stats = {
+            "type": data_type,
+            "distinct_count": distinct_count,
+            "null_count": row_count - non_null,
+            "min": min_value,
+            "max": max_value,
+            "categorical": _is_categorical(column, data_type, distinct_count, non_null),
+        }
+
+        # Only low-cardinality, repeating, non-PII text columns keep sample values
+        if stats["categorical"]:
+            counts = con.execute(
+                f"SELECT {col}, COUNT(*) AS n FROM {ident} WHERE {col} IS NOT NULL "
+                f"GROUP BY {col} ORDER BY n DESC, {col}"
+            ).fetchall()
+            stats["values"] = sorted(value for value, _ in counts)
+            stats["top_values"] = [{"value": value, "count": n} for value, n in counts[:int(top_k)]]
+
+        profile["columns"][column] = stats
+
+    return profile
+
+
+def load_catalog_stats(path: str = CATALOG_PATH) -> dict:
+    """Read persisted profiles (empty catalog if none yet)."""
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def profile_catalog(con, path: str = CATALOG_PATH, force: bool = False) -> dict:
+    """
+    Profile all tables in the database, skipping those whose signature is
+    unchanged since the last run, and persist the result to `path`.
+    Run after each data load.
+    """
+    catalog = load_catalog_stats(path)
+    # Profiles written in an older format are rebuilt from scratch
+    previous = catalog.get("tables", {}) if catalog.get("version") == PROFILE_VERSION else {}
+
+    tables = [row[0] for row in con.execute(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_schema = 'main' AND table_type = 'BASE TABLE' ORDER BY table_name"
+    ).fetchall()]
+
+    profiled = {}
+    for table in tables:
+        signature = _table_signature(con, table)
+        if not force and previous.get(table, {}).get("signature") == signature:
+            profiled[table] = previous[table]
+            continue
+
+        profile = profile_table(con, table)
+        profile["signature"] = signature
+        profile["profiled_at"] = datetime.now().isoformat()
+        profiled[table] = profile
+        print(f"📇 Profiled: {table} ({profile['row_count']} rows)")
+
+    catalog = {"version": PROFILE_VERSION, "updated_at": datetime.now().isoformat(), "tables": profiled}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2, default=str)
+
+    return catalog
+
+
+def _normalize(text: str) -> tuple:
+    return tuple(re.findall(r"[a-z0-9_]+", str(text).lower()))
+
+
+class CatalogIndex:
+    """
+    In-memory lookup over catalog stats.
+    Categorical values are indexed by their normalized words, so matching a
+    question is a handful of dict lookups rather than a scan of all values.
+    """
+
+    def __init__(self, catalog: dict):
+        self.tables = catalog.get("tables", {})
+        self._values = {}  # normalized words -> [(table, column, value)]
+        self._max_words = 1
+
+        for table, profile in self.tables.items():
+            for column, stats in profile.get("columns", {}).items():
+                values = stats.get("values", [entry["value"] for entry in stats.get("top_values", [])])
+                for value in values:
+                    words = _normalize(value)
+                    if not words or len(" ".join(words)) < 2:
+                        continue
+                    self._values.setdefault(words, []).append((table, column, value))
+                    self._max_words = max(self._max_words, len(words))
+
+    def __bool__(self):
+        return bool(self.tables)
+
+    def table_stats(self, table: str) -> dict:
+        return self.tables.get(table, {})
+
+    def column_stats(self, table: str, column: str) -> dict:
+        return self.table_stats(table).get("columns", {}).get(column, {})
+
+    def match_values(self, question: str) -> list:
+        """
+        Categorical values mentioned in the question (plurals tolerated),
+        e.g. "email campaigns" → [{"table": "dim_campaign", "column": "channel", "value": "Email"}].
+        """
+        words = _normalize(question)
+        found = {}
+        for size in range(min(self._max_words, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                gram = words[i:i + size]
+                candidates = [gram]
+                if gram[-1].endswith("s"):
+                    candidates.append(gram[:-1] + (gram[-1][:-1],))
+                for candidate in candidates:
+                    for table, column, value in self._values.get(candidate, []):
+                        found[(table, column, value)] = True
+        return [{"table": t, "column": c, "value": v} for t, c, v in found]
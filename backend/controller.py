@@ -1,16 +1,50 @@
 # 📦 controller.py
 # Orchestrates SQL generation + validation
 
-from metadata_loader import load_erd, load_glossary, load_schema_metadata
+import os
+import threading
+from collections import OrderedDict
+
+from metadata_loader import load_current_erd, load_glossary, load_schema_metadata, load_join_graph, load_catalog_index
 from rule_engine import rule_based_sql
 from llm_adapter import generate_sql_with_llm
-from sql_validator import validate_and_format_sql  # 🆕 Import validator
+from sql_validator import validate_joins  # 🆕 Import validator
+from sql_repair import generate_with_repair
+from admission import llm_admission, ShedLoad
+from db_backends import get_backend
 
 # 📦 Load metadata at startup (shared across requests)
-erd = load_erd()
 glossary = load_glossary()
 schema_metadata = load_schema_metadata()
 
+# ERD + join graph are loaded per request (cached until erd.yaml changes); warm the cache now
+load_join_graph(load_current_erd())
+
+# 🗃️ Recent validated LLM SQL by question – served when the LLM is overloaded
+LLM_CACHE_SIZE = int(os.environ.get("BLISS_LLM_CACHE_SIZE", "256"))
+_llm_cache = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+def _cache_key(question: str, backend: str) -> tuple:
+    # SQL is formatted for one engine's dialect, so cache per backend
+    return (backend, " ".join(question.lower().split()))
+
+def _cache_get(question: str, backend: str):
+    key = _cache_key(question, backend)
+    with _llm_cache_lock:
+        if key in _llm_cache:
+            _llm_cache.move_to_end(key)
+            return _llm_cache[key]
+    return None
+
+def _cache_put(question: str, backend: str, sql: str):
+    key = _cache_key(question, backend)
+    with _llm_cache_lock:
+        _llm_cache[key] = sql
+        _llm_cache.move_to_end(key)
+        while len(_llm_cache) > LLM_CACHE_SIZE:
+            _llm_cache.popitem(last=False)
+
 def extract_matched_terms(question: str, glossary: dict) -> list:
     matched = set()
     q_lower = question.lower()
@@ -24,33 +58,83 @@ def extract_matched_terms(question: str, glossary: dict) -> list:
 
     return sorted(matched)
 
-def generate_sql_response(question: str) -> dict:
+def generate_sql_response(question: str, priority: str = "interactive", backend: str = None) -> dict:
     """
     Main orchestration function:
     - Generate SQL using rule engine + LLM
-    - Validate + format LLM SQL
+    - Validate + format LLM SQL (including joins vs. the ERD)
+    - Repair rejected SQL using EXPLAIN errors (bounded retries)
     - Detect matched business terms
+    
+    LLM work goes through the admission controller. If the LLM is too busy,
+    cached or rule-engine SQL is returned instead (admission.QueueFull is
+    raised when the queue is full).
+    
+    `backend` names the engine the SQL will run on (same as /run_sql);
+    the repair loop EXPLAINs against it and formats for its dialect.
     """
-    rule_sql = rule_based_sql(question, erd)
+    engine = get_backend(backend)
 
-    # LLM SQL generation
-    llm_sql_raw = generate_sql_with_llm(question, erd, glossary, schema_metadata)
+    # 🧱 ERD + join graph (re-read / rebuilt only when erd.yaml changes)
+    erd = load_current_erd()
+    join_graph = load_join_graph(erd)
 
-    # Validate and format LLM SQL
-    validation_result = validate_and_format_sql(llm_sql_raw)
+    # 📇 Column stats + sample values (re-read only after a new profile)
+    catalog = load_catalog_index()
+
+    rule_sql = rule_based_sql(question, erd, join_graph, catalog)
+    matched_terms = extract_matched_terms(question, glossary)
+
+    try:
+        with llm_admission.slot(priority):
+            # LLM SQL generation
+            llm_sql_raw = generate_sql_with_llm(question, erd, glossary, schema_metadata, join_graph, catalog)
+
+            # Validate, EXPLAIN and (if needed) repair LLM SQL
+            validation_result = generate_with_repair(question, llm_sql_raw, erd, backend=engine)
+
+    except ShedLoad as e:
+        # ⏳ Degrade gracefully: cached LLM SQL, else rule-engine SQL
+        cached_sql = _cache_get(question, engine.name)
+        if cached_sql:
+            final_llm_sql = cached_sql
+            validation_status = f"LLM busy ⏳ (~{e.estimated_wait:.0f}s wait): served cached SQL ✅"
+        else:
+            final_llm_sql = rule_sql
+            validation_status = f"LLM busy ⏳ (~{e.estimated_wait:.0f}s wait): showing rule-based SQL"
+
+        return {
+            "rule_based_sql": rule_sql,
+            "llm_sql": final_llm_sql,
+            "matched_terms": matched_terms,
+            "validation_status": validation_status,
+            "degraded": True
+        }
+
+    attempts = validation_result["attempts"]
 
     if validation_result["success"]:
-        final_llm_sql = validation_result["formatted_sql"]
-        validation_status = "Validated ✅"
+        repair_note = f" (repaired in {attempts} attempt(s))" if attempts else ""
+        final_llm_sql = validation_result["sql"]
+        join_check = validate_joins(final_llm_sql, join_graph, dialect=engine.dialect)
+        if join_check["success"]:
+            # Only SQL that passed every check is served again as "cached SQL ✅"
+            _cache_put(question, engine.name, final_llm_sql)
+        if join_check["success"] and join_check["unchecked"]:
+            validation_status = f"Validated ✅{repair_note} (joins not checked: {'; '.join(join_check['unchecked'])})"
+        elif join_check["success"]:
+            validation_status = f"Validated ✅{repair_note}"
+        else:
+            validation_status = f"Join Warning ⚠️{repair_note}: {'; '.join(join_check['issues'])}"
     else:
-        final_llm_sql = llm_sql_raw
-        validation_status = f"Validation Failed ⚠️: {validation_result['error']}"
-
-    matched_terms = extract_matched_terms(question, glossary)
+        repair_note = f" (after {attempts} repair attempt(s))" if attempts else ""
+        final_llm_sql = validation_result["sql"]
+        validation_status = f"Validation Failed ⚠️{repair_note}: {validation_result['error']}"
 
     return {
         "rule_based_sql": rule_sql,
         "llm_sql": final_llm_sql,
         "matched_terms": matched_terms,
-        "validation_status": validation_status
+        "validation_status": validation_status,
+        "degraded": False
     }
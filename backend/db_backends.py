@@ -0,0 +1,382 @@
+# db_backends.py
+
+"""
+🗄️ Execution Backends – Warehouse Connector Layer
+--------------------------------------------------
+Common interface for the engines BLISS can run SQL on.
+Each backend owns its connection pool, its sqlglot dialect,
+async execution, streaming fetch, cancellation and EXPLAIN/stats.
+
+DuckDB and SQLite ship as local reference implementations;
+Redshift/BigQuery/Snowflake connectors plug in by subclassing ExecutionBackend
+and registering themselves in BACKENDS.
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+# 📂 Default local database paths
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+DUCKDB_PATH = os.environ.get("BLISS_DUCKDB_PATH", os.path.join(DATA_DIR, "marketing.db"))
+SQLITE_PATH = os.environ.get("BLISS_SQLITE_PATH", os.path.join(DATA_DIR, "marketing.sqlite"))
+
+# ⚙️ Backend used when a request doesn't name one
+DEFAULT_BACKEND = os.environ.get("BLISS_BACKEND", "duckdb")
+POOL_SIZE = int(os.environ.get("BLISS_POOL_SIZE", "4"))
+
+# ⏲️ Seconds without queries before a file-locking engine (DuckDB) closes its pool
+IDLE_RELEASE_S = float(os.environ.get("BLISS_IDLE_RELEASE_S", "30"))
+
+
+class QueryCancelled(Exception):
+    """Raised when an in-flight query is interrupted via cancel()."""
+
+
+class ExecutionBackend(ABC):
+    """
+    Base class for SQL execution engines.
+    Subclasses only need to open connections and describe their dialect;
+    pooling, timing, streaming and cancellation are shared here.
+    """
+
+    name = "base"
+    dialect = None  # sqlglot dialect name used when transpiling for this engine
+
+    def __init__(self, pool_size: int = POOL_SIZE):
+        self.pool_size = pool_size
+        self._pool = queue.Queue(maxsize=pool_size)
+        self._created = 0
+        self._borrowed = 0
+        self._idle_timer = None
+        self._lock = threading.Lock()
+        self._in_flight = {}  # query_id -> connection
+        self._cancelled = set()
+        self._stats = {"queries": 0, "errors": 0, "cancelled": 0, "total_ms": 0.0}
+
+    # 🔌 Engine-specific hooks
+    @abstractmethod
+    def _connect(self):
+        """Open a new DB-API connection for the pool."""
+
+    def _explain_sql(self, sql: str) -> str:
+        return f"EXPLAIN {sql}"
+
+    def _interrupt(self, con):
+        con.interrupt()
+
+    def _open_cursor(self, con):
+        """Object the query runs on. Must be what _interrupt(con) cancels."""
+        return con.cursor()
+
+    def _close_cursor(self, con, cur):
+        if cur is not con:
+            cur.close()
+
+    # 🏊 Connection pooling
+    idle_release_s = None  # close the pool after this many idle seconds (None = keep open)
+
+    def _acquire(self):
+        with self._lock:
+            self._borrowed += 1
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                pass
+
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    self._borrowed -= 1
+                    raise
+
+        # Pool exhausted – wait for a connection to come back
+        return self._pool.get()
+
+    def _release(self, con):
+        with self._lock:
+            self._borrowed -= 1
+            self._pool.put(con)
+            if self.idle_release_s is not None and self._borrowed == 0:
+                # Keep the pool warm for the next query, but let go of the
+                # file once traffic stops (e.g. so a data load can run)
+                self._idle_timer = threading.Timer(self.idle_release_s, self._release_if_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def _release_if_idle(self):
+        with self._lock:
+            if self._borrowed == 0:
+                self._close_idle()
+
+    def _close_idle(self):
+        """Close every pooled connection. Caller holds self._lock."""
+        while True:
+            try:
+                con = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            con.close()
+            self._created -= 1
+        self._on_pool_closed()
+
+    def _on_pool_closed(self):
+        """Hook for engines holding resources beyond the pooled connections."""
+
+    @contextmanager
+    def connection(self, query_id: str = None):
+        """
+        Borrow a pooled connection. When a query_id is given the connection
+        is tracked as in-flight so cancel(query_id) can interrupt it.
+        """
+        con = self._acquire()
+        if query_id:
+            with self._lock:
+                self._in_flight[query_id] = con
+        try:
+            yield con
+        finally:
+            if query_id:
+                with self._lock:
+                    self._in_flight.pop(query_id, None)
+            self._release(con)
+
+    # 🏃 Execution
+    def execute(self, sql: str, query_id: str = None) -> dict:
+        """
+        Run SQL and return {"columns": [...], "rows": [...], "elapsed_ms": float}.
+        Raises QueryCancelled if the query was interrupted.
+        """
+        query_id = query_id or uuid.uuid4().hex
+        start = time.perf_counter()
+        try:
+            with self.connection(query_id) as con:
+                cur = self._open_cursor(con)
+                try:
+                    cur.execute(sql)
+                    rows = cur.fetchall()
+                    columns = [desc[0] for desc in cur.description] if cur.description else []
+                finally:
+                    self._close_cursor(con, cur)
+        except Exception as e:
+            cancelled = self._was_cancelled(query_id, clear=True)
+            self._record(start, error=True, cancelled=cancelled)
+            if cancelled:
+                raise QueryCancelled(f"Query {query_id} cancelled") from e
+            raise
+
+        elapsed_ms = self._record(start)
+        return {"columns": columns, "rows": rows, "elapsed_ms": round(elapsed_ms, 2)}
+
+    async def execute_async(self, sql: str, query_id: str = None) -> dict:
+        """Run execute() on a worker thread so the event loop stays free."""
+        return await asyncio.to_thread(self.execute, sql, query_id)
+
+    def stream(self, sql: str, batch_size: int = 1000, query_id: str = None):
+        """
+        Generator yielding the column list first, then row batches of batch_size.
+        Keeps memory flat for large result sets.
+        """
+        query_id = query_id or uuid.uuid4().hex
+        start = time.perf_counter()
+        try:
+            with self.connection(query_id) as con:
+                cur = self._open_cursor(con)
+                try:
+                    cur.execute(sql)
+                    yield [desc[0] for desc in cur.description] if cur.description else []
+                    while True:
+                        batch = cur.fetchmany(batch_size)
+                        if not batch:
+                            break
+                        yield batch
+                finally:
+                    self._close_cursor(con, cur)
+        except Exception as e:
+            cancelled = self._was_cancelled(query_id, clear=True)
+            self._record(start, error=True, cancelled=cancelled)
+            if cancelled:
+                raise QueryCancelled(f"Query {query_id} cancelled") from e
+            raise
+        self._record(start)
+
+    def cancel(self, query_id: str) -> bool:
+        """Interrupt an in-flight query. Returns False if it isn't running."""
+        with self._lock:
+            con = self._in_flight.get(query_id)
+            if con is None:
+                return False
+            self._cancelled.add(query_id)
+        try:
+            self._interrupt(con)
+        except Exception:
+            return False  # finished (and closed) in the meantime
+        return True
+
+    def explain(self, sql: str) -> str:
+        """Return the engine's query plan as text (no data is scanned)."""
+        with self.connection() as con:
+            cur = self._open_cursor(con)
+            try:
+                cur.execute(self._explain_sql(sql))
+                rows = cur.fetchall()
+            finally:
+                self._close_cursor(con, cur)
+        # Plan text lives in the last column for both DuckDB and SQLite
+        return "\n".join(str(row[-1]) for row in rows)
+
+    # 📊 Stats
+    def _was_cancelled(self, query_id: str, clear: bool = False) -> bool:
+        with self._lock:
+            cancelled = query_id in self._cancelled
+            if clear:
+                self._cancelled.discard(query_id)
+        return cancelled
+
+    def _record(self, start: float, error: bool = False, cancelled: bool = False) -> float:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["total_ms"] += elapsed_ms
+            if error:
+                self._stats["errors"] += 1
+            if cancelled:
+                self._stats["cancelled"] += 1
+        return elapsed_ms
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._in_flight)
+            stats["pool_open"] = self._created
+        stats["avg_ms"] = round(stats["total_ms"] / stats["queries"], 2) if stats["queries"] else 0.0
+        stats["total_ms"] = round(stats["total_ms"], 2)
+        return {"backend": self.name, "dialect": self.dialect, "pool_size": self.pool_size, **stats}
+
+    def close(self):
+        """Close every idle pooled connection."""
+        with self._lock:
+            self._close_idle()
+
+
+class DuckDBBackend(ExecutionBackend):
+    """
+    Local DuckDB file – the default BLISS engine.
+
+    The pool is read-only and stays open while queries keep coming. After
+    BLISS_IDLE_RELEASE_S seconds without queries (or on close()) it lets go of
+    the file, so data/load_to_duckdb.py can take its write lock.
+    """
+
+    name = "duckdb"
+    dialect = "duckdb"
+    idle_release_s = IDLE_RELEASE_S
+
+    def __init__(self, path: str = DUCKDB_PATH, pool_size: int = POOL_SIZE):
+        super().__init__(pool_size)
+        self.path = path
+        self._root = None
+
+    def _connect(self):
+        # Pooled connections are cursors sharing a single root connection.
+        # _acquire() holds self._lock here, so the root is opened only once.
+        import duckdb
+
+        if self._root is None:
+            if self.path == ":memory:":
+                self._root = duckdb.connect(self.path)
+            else:
+                if not os.path.exists(self.path):
+                    raise FileNotFoundError(
+                        f"DuckDB database not found: {self.path}. Run data/load_to_duckdb.py to create it."
+                    )
+                self._root = duckdb.connect(self.path, read_only=True)
+        return self._root.cursor()
+
+    def _open_cursor(self, con):
+        # Each pooled DuckDB connection is already a cursor. Running the query
+        # on a further cursor would put it out of reach of con.interrupt().
+        return con
+
+    def _on_pool_closed(self):
+        if self._root is not None and self._created == 0:
+            self._root.close()
+            self._root = None
+
+
+class SQLiteBackend(ExecutionBackend):
+    """Local SQLite file – lightweight reference engine for side-by-side benchmarks."""
+
+    name = "sqlite"
+    dialect = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH, pool_size: int = POOL_SIZE):
+        super().__init__(pool_size)
+        self.path = path
+
+    def _connect(self):
+        # sqlite3.connect would silently create an empty database
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"SQLite database not found: {self.path}. Run data/load_to_duckdb.py to create it."
+            )
+        # Read-only, like the DuckDB pool – /run_sql must not modify the mirror
+        uri = "file:" + pathname2url(os.path.abspath(self.path)) + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+
+    def _explain_sql(self, sql: str) -> str:
+        return f"EXPLAIN QUERY PLAN {sql}"
+
+
+# 🗂️ Registry of available engines (name -> class)
+BACKENDS = {
+    DuckDBBackend.name: DuckDBBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name: str = None) -> ExecutionBackend:
+    """
+    Return the shared backend instance for `name` (defaults to BLISS_BACKEND).
+    Instances are created lazily so each engine keeps a single pool.
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available: {', '.join(sorted(BACKENDS))}")
+
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
+
+
+def release_backends():
+    """Close the idle pools of every backend (frees DuckDB's file lock for a data load)."""
+    with _instances_lock:
+        backends = list(_instances.values())
+    for backend in backends:
+        backend.close()
+
+
+def backend_stats() -> list:
+    """Stats for every backend used so far – handy for comparing engines side by side."""
+    with _instances_lock:
+        backends = list(_instances.values())
+    return [b.stats() for b in backends]
@@ -0,0 +1,242 @@
+# join_planner.py
+
+"""
+🧭 Join Planner – ERD Join Graph
+--------------------------------
+Builds an in-memory graph from the ERD `joins` lists and precomputes the
+shortest join path between every pair of tables.
+
+Used by:
+- the LLM adapter, to spell out join paths in the prompt
+- the rule engine, to assemble multi-table SQL
+- the SQL validator, to check the joins an LLM query uses
+"""
+
+import hashlib
+import json
+import threading
+from collections import deque
+
+import sqlglot
+from sqlglot import exp
+
+
+class JoinGraph:
+    """
+    Undirected graph of tables (nodes) and ERD join keys (edges).
+    All-pairs shortest paths are computed once, at construction.
+    """
+
+    def __init__(self, erd: dict):
+        self.tables = set(erd or {})
+        self.edges = {table: {} for table in self.tables}  # table -> {neighbour: join key}
+
+        for table, details in (erd or {}).items():
+            for join in (details or {}).get("joins", []) or []:
+                other, key = join.get("table"), join.get("on")
+                if not other or not key:
+                    continue
+                self.tables.add(other)
+                self.edges.setdefault(table, {})[other] = key
+                self.edges.setdefault(other, {})[table] = key
+
+        self._paths = {table: self._bfs(table) for table in self.tables}
+
+    def _bfs(self, start: str) -> dict:
+        """Shortest path (as a list of tables) from start to every reachable table."""
+        paths = {start: [start]}
+        frontier = deque([start])
+        while frontier:
+            current = frontier.popleft()
+            # Sorted for deterministic paths when several are equally short
+            for neighbour in sorted(self.edges.get(current, {})):
+                if neighbour not in paths:
+                    paths[neighbour] = paths[current] + [neighbour]
+                    frontier.append(neighbour)
+        return paths
+
+    # 🔎 Lookups
+    def join_key(self, left: str, right: str):
+        """Join column between two directly related tables, else None."""
+        return self.edges.get(left, {}).get(right)
+
+    def path(self, source: str, target: str) -> list:
+        """
+        Shortest join path as steps [(left_table, right_table, key), ...].
+        Empty list if source == target; None if the tables aren't connected.
+        """
+        tables = self._paths.get(source, {}).get(target)
+        if tables is None:
+            return None
+        return [(a, b, self.edges[a][b]) for a, b in zip(tables, tables[1:])]
+
+    def describe_path(self, source: str, target: str) -> str:
+        """Human-readable path, e.g. 'dim_campaign → fact_message_event (campaign_id)'."""
+        steps = self.path(source, target)
+        if steps is None:
+            return f"{source} ↮ {target} (no join path)"
+        parts = [source] + [f"{right} ({key})" for _, right, key in steps]
+        return " → ".join(parts)
+
+    # 🏗️ SQL assembly
+    def default_base(self, tables: list) -> str:
+        """
+        Best starting table: the one closest to all `tables` (it may be a table
+        not in the list, e.g. the fact table linking two dimensions).
+        Ties go to the table with the most joins.
+        """
+        def cost(candidate):
+            reachable = self._paths.get(candidate, {})
+            hops = sum(len(reachable[t]) if t in reachable else len(self.tables) + 1 for t in tables)
+            return (hops, -len(self.edges.get(candidate, {})), candidate)
+
+        return min(self.tables | set(tables), key=cost)
+
+    def plan(self, tables: list, base: str = None) -> list:
+        """
+        Join steps connecting every table in `tables`, starting from `base`
+        (default: see default_base).
+        Each step is (left_table, right_table, key), ordered so left is already joined.
+        Raises ValueError if some table can't be reached.
+        """
+        tables = list(dict.fromkeys(tables))
+        if not tables:
+            return []
+        base = base or self.default_base(tables)
+
+        joined, steps = {base}, []
+        for table in sorted(tables, key=lambda t: len(self.path(base, t) or [])):
+            route = self.path(base, table)
+            if route is None:
+                raise ValueError(f"No join path between {base} and {table}")
+            for left, right, key in route:
+                if right not in joined:
+                    steps.append((left, right, key))
+                    joined.add(right)
+        return steps
+
+    def from_clause(self, tables: list, base: str = None) -> str:
+        """FROM … JOIN … ON … clause covering all `tables` via shortest paths."""
+        tables = list(dict.fromkeys(tables))
+        if not tables:
+            return ""
+        base = base or self.default_base(tables)
+        lines = [f"FROM {base}"]
+        for left, right, key in self.plan(tables, base):
+            lines.append(f"JOIN {right} ON {left}.{key} = {right}.{key}")
+        return "\n".join(lines)
+
+    # 🛡️ Validation
+    def check_joins(self, sql_query: str, dialect: str = "duckdb") -> dict:
+        """
+        Compare the join conditions in `sql_query` with the ERD.
+        Checks JOIN … ON and JOIN … USING, plus WHERE equalities between
+        two tables (implicit joins like FROM a, b WHERE a.x = b.y).
+
+        Returns:
+            {
+                "issues": list[str]     (conditions that contradict the ERD),
+                "unchecked": list[str]  (ERD tables joined without a checkable condition)
+            }
+        """
+        parsed = sqlglot.parse_one(sql_query, read=dialect)
+
+        # Resolve aliases (m → fact_message_event)
+        aliases = {}
+        query_tables = []
+        for table in parsed.find_all(exp.Table):
+            aliases[table.alias_or_name] = table.name
+            if table.name in self.tables and table.name not in query_tables:
+                query_tables.append(table.name)
+
+        issues, linked = [], set()
+
+        # Equality conditions from JOIN … ON and WHERE
+        conditions = []
+        for join in parsed.find_all(exp.Join):
+            if join.args.get("on") is not None:
+                conditions.append(join.args["on"])
+        for where in parsed.find_all(exp.Where):
+            conditions.append(where.this)
+
+        for condition in conditions:
+            for eq in condition.find_all(exp.EQ):
+                left, right = eq.this, eq.expression
+                if not (isinstance(left, exp.Column) and isinstance(right, exp.Column)):
+                    continue
+                if not (left.table and right.table):
+                    continue
+
+                lt, rt = aliases.get(left.table, left.table), aliases.get(right.table, right.table)
+                if lt == rt or lt not in self.tables or rt not in self.tables:
+                    continue
+
+                linked.update((lt, rt))
+                key = self.join_key(lt, rt)
+                if key is None:
+                    issues.append(
+                        f"{lt} and {rt} are not directly related in the ERD; "
+                        f"expected path: {self.describe_path(lt, rt)}"
+                    )
+                elif left.name != key or right.name != key:
+                    issues.append(
+                        f"{lt}.{left.name} = {rt}.{right.name} does not match the ERD; "
+                        f"join on {key}"
+                    )
+
+        # JOIN … USING (col): some other table in the query must join on col
+        for join in parsed.find_all(exp.Join):
+            using = join.args.get("using")
+            if not using or not isinstance(join.this, exp.Table):
+                continue
+            rt = join.this.name
+            if rt not in self.tables:
+                continue
+            for ident in using:
+                col = ident.name
+                partners = [t for t in query_tables if t != rt and self.join_key(t, rt) == col]
+                if partners:
+                    linked.update((partners[0], rt))
+                else:
+                    expected = ", ".join(f"{t} on {k}" for t, k in sorted(self.edges.get(rt, {}).items()))
+                    issues.append(
+                        f"{rt} USING ({col}) does not match the ERD; "
+                        f"{rt} joins {expected or 'no tables'}"
+                    )
+                    linked.add(rt)
+
+        # Tables joined with no condition we could check (CROSS JOIN, unqualified columns, …)
+        unchecked = []
+        if len(query_tables) > 1:
+            unchecked = [
+                f"join to {table} not checked (no table-qualified join condition)"
+                for table in query_tables if table not in linked
+            ]
+
+        return {"issues": issues, "unchecked": unchecked}
+
+
+# 🗃️ Cache of built graphs, keyed by ERD content
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def erd_fingerprint(erd: dict) -> str:
+    """Stable hash of the ERD so a changed file triggers a rebuild."""
+    payload = json.dumps(erd or {}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def get_join_graph(erd: dict) -> JoinGraph:
+    """
+    Return the JoinGraph for this ERD, building it only when the ERD
+    content hasn't been seen before (i.e. metadata changed).
+    """
+    key = erd_fingerprint(erd)
+    with _cache_lock:
+        graph = _cache.get(key)
+        if graph is None:
+            graph = JoinGraph(erd)
+            _cache.clear()  # only the current ERD is worth keeping
+            _cache[key] = graph
+        return graph
@@ -2,18 +2,67 @@
 
 import os
 import requests
-from metadata_loader import load_erd, load_glossary, load_schema_metadata
+from catalog_profiler import sql_literal
+from admission import LLM_MAX_WAIT_S
 
-# Load metadata for prompt generation
-erd = load_erd()
-glossary = load_glossary()
-schema_metadata = load_schema_metadata()
+# ⏱️ Max seconds per LLM call – the caller holds an admission slot meanwhile
+LLM_TIMEOUT_S = float(os.environ.get("BLISS_LLM_TIMEOUT_S", str(LLM_MAX_WAIT_S)))
 
-def format_prompt(question, erd, glossary, schema_metadata):
+# ERD, glossary and schema metadata are passed in per call by the controller,
+# so edits to erd.yaml are picked up without a restart
+
+def relevant_tables(question, erd, glossary):
+    """
+    Tables the question seems to touch, via table/column names or glossary terms.
+    """
+    q_lower = question.lower()
+    tables = set()
+
+    for table, details in erd.items():
+        if table.lower() in q_lower or any(col.lower() in q_lower for col in details.get("columns", [])):
+            tables.add(table)
+
+    for entry in glossary.values():
+        if entry["term"] in q_lower or any(s in q_lower for s in entry.get("synonyms", [])):
+            if entry["table"] in erd:
+                tables.add(entry["table"])
+
+    return sorted(tables)
+
+
+def format_catalog_context(tables, catalog):
+    """
+    Column statistics for the given tables: row counts, value ranges,
+    and the actual values of categorical columns.
+    """
+    lines = []
+    for table in tables:
+        profile = catalog.table_stats(table)
+        if not profile:
+            continue
+        lines.append(f"- {table} ({profile.get('row_count', '?')} rows)")
+        for col, stats in profile.get("columns", {}).items():
+            if stats.get("top_values"):
+                values = ", ".join(sql_literal(v["value"]) for v in stats["top_values"])
+                hidden = stats["distinct_count"] - len(stats["top_values"])
+                if hidden > 0:
+                    values += f", … (+{hidden} more)"
+                lines.append(f"  - {col} ({stats['type']}, {stats['distinct_count']} distinct): {values}")
+            elif stats.get("min") is not None:
+                lines.append(f"  - {col} ({stats['type']}): {stats['min']} … {stats['max']}")
+    return "\n".join(lines)
+
+
+def format_prompt(question, erd, glossary, schema_metadata, join_graph=None, catalog=None):
     """
     Formats a system prompt for the LLM using ERD, glossary, and schema metadata.
     Helps the model generate more accurate and relevant SQL queries.
+    With a join graph, the exact join path between relevant tables is spelled out.
+    With a catalog index, real column values ground the filters the model writes.
     """
+    tables = relevant_tables(question, erd, glossary)
+    value_matches = catalog.match_values(question) if catalog else []
+    tables = sorted(set(tables) | {m["table"] for m in value_matches if m["table"] in erd})
 
     # 🧱 ERD (Entity Relationship Diagram) context
     erd_lines = []
@@ -49,6 +98,36 @@ def format_prompt(question, erd, glossary, schema_metadata):
                 schema_lines.append(f"- {table}.{col}: {desc}")
     schema_context = "\n".join(schema_lines) if schema_lines else "No additional schema metadata available."
 
+    # 🧭 Join paths between the tables this question touches
+    join_context = ""
+    if join_graph is not None:
+        if len(tables) > 1:
+            try:
+                join_context = join_graph.from_clause(tables)
+            except ValueError:
+                join_context = ""
+    join_section = f"""
+## Join Path
+Use exactly these joins to connect the relevant tables:
+{join_context}
+""" if join_context else ""
+
+    # 📇 Catalog statistics and values mentioned in the question
+    catalog_section = ""
+    if catalog:
+        catalog_context = format_catalog_context(tables or list(erd), catalog)
+        value_lines = [f"- {m['table']}.{m['column']} = {sql_literal(m['value'])}" for m in value_matches]
+        value_context = "\n".join(value_lines) if value_lines else "None detected."
+        if catalog_context:
+            catalog_section = f"""
+## Column Statistics
+Actual values and ranges in the data (most frequent values shown):
+{catalog_context}
+
+## Filter Values Mentioned in the Question
+{value_context}
+"""
+
     # 🧪 Compose the final prompt
     prompt = f"""
 You are a precise and reliable assistant that translates business questions into SQL queries.
@@ -63,12 +142,13 @@ Use this glossary to map business terms in the question to the appropriate table
 ## Column Metadata
 Each table and its columns with data types:
 {schema_context}
-
+{catalog_section}{join_section}
 ## Rules:
 - Only use the tables and columns that exist in the provided schema.
 - If terms in the user question match glossary definitions or column names, use them confidently.
 - Use proper SQL syntax and aliases for clarity.
 - Prefer INNER JOINs unless otherwise implied.
+- When filtering categorical columns, prefer the exact literal values listed in the column statistics.
 - Do not explain the query. Only return the SQL code.
 
 ### User Question:
@@ -83,28 +163,85 @@ Each table and its columns with data types:
 def clean_sql_output(sql: str) -> str:
     """
     Cleans up LLM-generated SQL to remove problematic characters.
+    Single quotes are kept: they delimit the string literals used in filters.
     """
-    return sql.strip().replace("`", "").replace("'", "")
+    sql = sql.strip()
+    if sql.startswith("```"):
+        # Drop a markdown fence and its language tag (```sql ... ```)
+        sql = sql.split("\n", 1)[1] if "\n" in sql else ""
+    return sql.replace("`", "").strip()
 
 
-def generate_sql_with_llm(question, erd, glossary, schema_metadata={}):
+def call_llm(prompt, timeout=LLM_TIMEOUT_S):
     """
-    Calls the local Mistral LLM using the formatted prompt to generate SQL.
+    Sends a prompt to the local Mistral LLM (via Ollama) and returns cleaned SQL.
+    Timeouts and connection failures come back as "-- ERROR: ..." strings.
     """
-    prompt = format_prompt(question, erd, glossary, schema_metadata)
-
     # 🧪 Local LLM (Mistral) Inference via Ollama
-    response = requests.post(
-        "http://localhost:11434/api/generate",
-        json={
-            "model": "mistral",
-            "prompt": prompt,
-            "stream": False
-        }
-    )
+    try:
+        response = requests.post(
+            "http://localhost:11434/api/generate",
+            json={
+                "model": "mistral",
+                "prompt": prompt,
+                "stream": False
+            },
+            timeout=timeout
+        )
+    except requests.Timeout:
+        return "-- ERROR: LLM call timed out"
+    except requests.RequestException as e:
+        return f"-- ERROR: LLM unreachable ({type(e).__name__})"
 
     if response.status_code == 200:
         raw_sql = response.json().get("response", "").strip()
         return clean_sql_output(raw_sql)
     else:
         return f"-- ERROR: LLM call failed ({response.status_code})"
+
+
+def generate_sql_with_llm(question, erd, glossary, schema_metadata={}, join_graph=None, catalog=None,
+                          timeout=LLM_TIMEOUT_S):
+    """
+    Calls the local Mistral LLM using the formatted prompt to generate SQL.
+    """
+    prompt = format_prompt(question, erd, glossary, schema_metadata, join_graph, catalog)
+    return call_llm(prompt, timeout=timeout)
+
+
+def format_repair_prompt(question, sql, error, erd):
+    """
+    Short prompt asking the LLM to fix a query the database rejected.
+    Only the compact schema, the broken SQL and the exact error are sent –
+    much cheaper than regenerating from the full prompt.
+    """
+    schema_lines = [f"- {table}: {', '.join(details.get('columns', []))}" for table, details in erd.items()]
+    schema_context = "\n".join(schema_lines)
+
+    prompt = f"""
+Fix this SQL query so it runs. Only return the corrected SQL code.
+
+## Tables
+{schema_context}
+
+### User Question:
+{question}
+
+### Broken SQL:
+{sql}
+
+### Database Error:
+{error}
+
+### Corrected SQL Query:
+"""
+
+    return prompt.strip()
+
+
+def repair_sql_with_llm(question, sql, error, erd, timeout=LLM_TIMEOUT_S):
+    """
+    Asks the LLM to repair `sql` given the database/validator error message.
+    """
+    prompt = format_repair_prompt(question, sql, error, erd)
+    return call_llm(prompt, timeout=timeout)
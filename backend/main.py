@@ -10,10 +10,15 @@ Receives user questions and returns both:
 4. Captures user feedback
 """
 
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from controller import generate_sql_response
 from run_sql import run_sql_query
+from db_backends import get_backend, backend_stats, release_backends
+from sql_repair import repair_stats
+from admission import llm_admission, QueueFull, retry_after_header
+from catalog_profiler import profile_catalog, load_catalog_stats
 from feedback_logger import save_feedback  # ✅ Corrected import
 
 # 🚀 Initialize FastAPI app
@@ -22,9 +27,17 @@ app = FastAPI()
 # 📝 Request models
 class QueryRequest(BaseModel):
     question: str
+    priority: str = "interactive"  # "interactive" (UI) or "batch"
+    backend: Optional[str] = None  # engine the SQL will run on (defaults to BLISS_BACKEND)
 
 class RunSQLRequest(BaseModel):
     sql_query: str
+    backend: Optional[str] = None   # e.g. "duckdb", "sqlite" (defaults to BLISS_BACKEND)
+    query_id: Optional[str] = None  # lets the client cancel a long-running query
+
+class CancelSQLRequest(BaseModel):
+    query_id: str
+    backend: Optional[str] = None
 
 class FeedbackRequest(BaseModel):
     question: str
@@ -40,12 +53,63 @@ def read_root():
 # 📡 SQL generation endpoint
 @app.post("/generate_sql")
 def generate_sql(request: QueryRequest):
-    return generate_sql_response(request.question)
+    try:
+        return generate_sql_response(request.question, priority=request.priority, backend=request.backend)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers=retry_after_header(e))
+    except ValueError as e:
+        # Unknown backend name
+        raise HTTPException(status_code=400, detail=str(e))
+
+# 📡 LLM queue depth, estimated wait and load-shedding counters
+@app.get("/llm_queue_stats")
+def get_llm_queue_stats():
+    return llm_admission.stats()
 
 # 📡 SQL execution endpoint
 @app.post("/run_sql")
 def run_sql(request: RunSQLRequest):
-    return run_sql_query(request.sql_query)
+    return run_sql_query(request.sql_query, backend=request.backend, query_id=request.query_id)
+
+# 📡 Cancel a running query
+@app.post("/cancel_sql")
+def cancel_sql(request: CancelSQLRequest):
+    try:
+        cancelled = get_backend(request.backend).cancel(request.query_id)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"query_id": request.query_id, "cancelled": cancelled}
+
+# 📡 Release database files (run before a data load while the API is up)
+@app.post("/release_db")
+def release_db():
+    release_backends()
+    return {"message": "✅ Idle database connections closed"}
+
+# 📡 Execution backend stats (compare engines side by side)
+@app.get("/backend_stats")
+def get_backend_stats():
+    return backend_stats()
+
+# 📡 SQL repair loop success rates (per attempt)
+@app.get("/repair_stats")
+def get_repair_stats():
+    return repair_stats()
+
+# 📡 Catalog statistics (per-column stats + sample values)
+@app.get("/catalog_stats")
+def get_catalog_stats():
+    return load_catalog_stats()
+
+# 📡 Re-profile changed tables (e.g. after a data load)
+@app.post("/profile_catalog")
+def refresh_catalog_stats():
+    try:
+        with get_backend("duckdb").connection() as con:
+            catalog = profile_catalog(con)
+    except Exception as e:
+        return {"error": str(e)}
+    return {"message": "✅ Catalog profiled", "tables": sorted(catalog["tables"])}
 
 # 📡 Feedback capture endpoint
 @app.post("/submit_feedback")
@@ -5,6 +5,9 @@ import os
 import yaml
 import csv
 
+from join_planner import get_join_graph
+from catalog_profiler import CatalogIndex, load_catalog_stats
+
 # Define the relative path to the metadata folder (one level up from backend)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'metadata'))
 
@@ -18,7 +21,55 @@ def load_erd(path="erd.yaml"):
         raise FileNotFoundError(f"ERD file not found: {full_path}")
 
     with open(full_path, "r") as f:
-        return yaml.safe_load(f)
+        erd = yaml.safe_load(f)
+
+    # YAML 1.1 reads the bare key `on:` as boolean True – restore it
+    for details in (erd or {}).values():
+        for join in (details or {}).get("joins", []) or []:
+            if True in join and "on" not in join:
+                join["on"] = join.pop(True)
+    return erd
+
+_erd_cache = {"mtime": None, "erd": None}
+
+def load_current_erd(path="erd.yaml"):
+    """
+    Returns the ERD, cached in memory and only re-read when the file changes.
+    Use this per request so ERD edits take effect without a restart.
+    """
+    full_path = os.path.join(BASE_DIR, path)
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"ERD file not found: {full_path}")
+
+    mtime = os.path.getmtime(full_path)
+    if _erd_cache["mtime"] != mtime:
+        _erd_cache["erd"] = load_erd(path)
+        _erd_cache["mtime"] = mtime
+    return _erd_cache["erd"]
+
+def load_join_graph(erd=None):
+    """
+    Builds the ERD join graph (shortest join paths between every pair of tables).
+    Cached by ERD content, so it is only rebuilt when the ERD changes.
+    """
+    return get_join_graph(erd if erd is not None else load_current_erd())
+
+_catalog_cache = {"mtime": None, "index": CatalogIndex({})}
+
+def load_catalog_index(path="catalog_stats.json"):
+    """
+    Loads column statistics and sample values written by the catalog profiler.
+    Cached in memory and only re-read when the file changes (e.g. after a data load).
+    """
+    full_path = os.path.join(BASE_DIR, path)
+    if not os.path.exists(full_path):
+        return CatalogIndex({})
+
+    mtime = os.path.getmtime(full_path)
+    if _catalog_cache["mtime"] != mtime:
+        _catalog_cache["index"] = CatalogIndex(load_catalog_stats(full_path))
+        _catalog_cache["mtime"] = mtime
+    return _catalog_cache["index"]
 
 def load_schema_metadata(path="schema_metadata.yaml"):
     """
@@ -10,6 +10,8 @@ This module is meant to be a fallback or helper before invoking the LLM.
 from typing import Dict, List
 import re
 
+from catalog_profiler import sql_literal
+
 
 # Simple rule-based fallback (not as intelligent as LLM)
 
@@ -27,18 +29,82 @@ def extract_relevant_tables_and_columns(question: str, erd: dict) -> list:
 
     return matches
 
-def rule_based_sql(question: str, erd: dict) -> str:
+def _table_nouns(table: str) -> set:
+    """Words that name a table in plain English: dim_customer → {"customer", "customers"}."""
+    words = [w for w in table.lower().split("_") if w not in ("dim", "fact")]
+    return set(words) | {w + "s" for w in words}
+
+def _resolve_value_words(question: str, matches: list, value_matches: list) -> tuple:
+    """
+    A word can name both a column ("email" → dim_customer.email) and a value
+    ("email" → dim_campaign.channel = 'Email'). Keep the column when the question
+    points at the column's table and not the value's (by name, a plural like
+    "customers", or another column of it); otherwise the value filter wins.
+    """
+    words = set(re.findall(r"[a-z0-9_]+", question.lower()))
+
+    def pointed_at(table, ambiguous):
+        if table.lower() in words or _table_nouns(table) & words:
+            return True
+        return any(t == table and col.lower() not in ambiguous for t, col in matches)
+
+    value_words = {str(m["value"]).lower() for m in value_matches}
+    keep_columns, drop_values = [], set()
+    for table, col in matches:
+        value_tables = {m["table"] for m in value_matches if str(m["value"]).lower() == col.lower()}
+        if col.lower() not in value_words or table in value_tables:
+            keep_columns.append((table, col))
+        elif pointed_at(table, value_words) and not any(pointed_at(t, value_words) for t in value_tables):
+            keep_columns.append((table, col))
+            drop_values.add(col.lower())
+
+    value_matches = [m for m in value_matches if str(m["value"]).lower() not in drop_values]
+    return keep_columns, value_matches
+
+def rule_based_sql(question: str, erd: dict, join_graph=None, catalog=None) -> str:
     """
     Generate naive SQL using pattern-based inference from ERD.
+    With a join graph, matches spanning several tables are joined
+    along the ERD's shortest join paths.
+    With a catalog index, categorical values named in the question
+    (e.g. "email" → channel = 'Email') become equality filters.
     """
     matches = extract_relevant_tables_and_columns(question, erd)
+    value_matches = [m for m in catalog.match_values(question) if m["table"] in erd] if catalog else []
+
+    # A word naming both a column and a value is read one way, not both
+    matches, value_matches = _resolve_value_words(question, matches, value_matches)
 
-    if not matches:
+    if not matches and not value_matches:
         return "-- No rule-based SQL generated"
 
-    # Use first match for fallback demo
-    table = matches[0][0]
-    where_clauses = [f"{col} IS NOT NULL" for _, col in matches]
+    # (table, column) -> predicate; value filters win over IS NOT NULL
+    values_by_column = {}
+    for m in value_matches:
+        values_by_column.setdefault((m["table"], m["column"]), []).append(sql_literal(m["value"]))
+
+    predicates = {}
+    for key, literals in values_by_column.items():
+        predicates[key] = f" = {literals[0]}" if len(literals) == 1 else f" IN ({', '.join(literals)})"
+    for key in matches:
+        predicates.setdefault(key, " IS NOT NULL")
+
+    tables = list(dict.fromkeys(table for table, _ in predicates))
+
+    if join_graph is not None and len(tables) > 1:
+        try:
+            from_clause = join_graph.from_clause(tables)
+        except ValueError:
+            from_clause = None
+
+        if from_clause:
+            where_clauses = [f"{table}.{col}{pred}" for (table, col), pred in predicates.items()]
+            where_clause = " AND ".join(where_clauses)
+            return f"SELECT *\n{from_clause}\nWHERE {where_clause};"
+
+    # Single table (or no join path): use first match for fallback demo
+    table = tables[0]
+    where_clauses = [f"{col}{pred}" for (t, col), pred in predicates.items() if t == table]
     where_clause = " AND ".join(where_clauses)
 
     return f"SELECT * FROM {table} WHERE {where_clause};"
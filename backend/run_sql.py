@@ -1,44 +1,40 @@
 # run_sql.py
 
 """
-🏃 SQL Runner – DuckDB Execution Layer
----------------------------------------
-Takes validated SQL queries and runs them safely against DuckDB.
+🏃 SQL Runner – Execution Layer
+--------------------------------
+Takes validated SQL queries and runs them safely against an execution backend
+(DuckDB by default, see db_backends.py for the available engines).
 """
 
-import duckdb
-import os
-
-# 📂 Path to DuckDB database
-DB_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "marketing.db")
+from db_backends import get_backend, QueryCancelled
+from sql_validator import validate_and_format_sql
 
 # 🏃 Main function to run SQL
-from sql_validator import validate_and_format_sql  # 🆕 Import
-
-def run_sql_query(sql_query: str):
+def run_sql_query(sql_query: str, backend: str = None, query_id: str = None):
     try:
-        # 🛡️ Step 1: Validate and format
-        validation = validate_and_format_sql(sql_query)
+        engine = get_backend(backend)
+
+        # 🛡️ Step 1: Validate and format for the engine's dialect
+        validation = validate_and_format_sql(sql_query, dialect=engine.dialect)
         
         if not validation["success"]:
             return {"error": f"SQL Validation Failed: {validation['error']}"}
         
         formatted_sql = validation["formatted_sql"]
 
-        # 🛡️ Step 2: Connect and Execute
-        con = duckdb.connect(DB_PATH)
-        result = con.execute(formatted_sql).fetchall()
-        columns = [desc[0] for desc in con.description]
+        # 🛡️ Step 2: Execute on a pooled connection
+        result = engine.execute(formatted_sql, query_id=query_id)
         
         return {
-            "columns": columns,
-            "rows": result
+            "columns": result["columns"],
+            "rows": result["rows"],
+            "backend": engine.name,
+            "elapsed_ms": result["elapsed_ms"]
         }
+
+    except QueryCancelled as e:
+        return {"error": f"Query cancelled: {e}"}
     
     except Exception as e:
         return {"error": str(e)}
-
-    finally:
-        # ✅ Always close the connection
-        if con:
-            con.close()
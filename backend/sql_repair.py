@@ -0,0 +1,111 @@
+# sql_repair.py
+
+"""
+🩹 SQL Repair Loop
+------------------
+Checks LLM SQL with a cheap EXPLAIN (plans the query, scans no data) and,
+when the validator or the database rejects it, feeds the exact error back
+to the LLM in a short repair prompt. Retries are bounded by an attempt
+budget and a wall-clock deadline.
+"""
+
+import os
+import threading
+import time
+
+from db_backends import get_backend
+from llm_adapter import repair_sql_with_llm
+from sql_validator import validate_and_format_sql
+
+# ⚙️ Retry budget (repair attempts after the first generation) and deadline
+MAX_REPAIR_ATTEMPTS = int(os.environ.get("BLISS_REPAIR_ATTEMPTS", "2"))
+REPAIR_DEADLINE_S = float(os.environ.get("BLISS_REPAIR_DEADLINE_S", "30"))
+
+# 📊 Outcomes per attempt (0 = original generation, 1.. = repairs)
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def check_sql(sql: str, backend=None) -> dict:
+    """
+    Validate + format SQL, then EXPLAIN it on the pooled connection.
+    Pass the backend the SQL will run on; it defaults to BLISS_BACKEND, like /run_sql.
+
+    Returns:
+        {
+            "success": bool,
+            "formatted_sql": str (if success),
+            "error": str (if failure)
+        }
+    """
+    engine = backend or get_backend()
+
+    validation = validate_and_format_sql(sql, dialect=engine.dialect)
+    if not validation["success"]:
+        return validation
+
+    try:
+        engine.explain(validation["formatted_sql"])
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+    return validation
+
+
+def _record(attempt: int, success: bool):
+    with _stats_lock:
+        entry = _stats.setdefault(attempt, {"attempts": 0, "successes": 0})
+        entry["attempts"] += 1
+        if success:
+            entry["successes"] += 1
+
+
+def repair_stats() -> dict:
+    """Success rate for each attempt number, e.g. {0: {...}, 1: {...}}."""
+    with _stats_lock:
+        return {
+            attempt: {
+                **entry,
+                "success_rate": round(entry["successes"] / entry["attempts"], 3) if entry["attempts"] else 0.0
+            }
+            for attempt, entry in sorted(_stats.items())
+        }
+
+
+def generate_with_repair(question: str, sql: str, erd: dict, backend=None,
+                         max_attempts: int = None, deadline_s: float = None) -> dict:
+    """
+    Check `sql` and repair it with the LLM until it passes, the attempt budget
+    runs out, or the deadline passes. `backend` should be the engine that
+    will execute the SQL, so EXPLAIN and dialect match execution.
+
+    Returns:
+        {
+            "success": bool,
+            "sql": str (formatted if success, last attempt otherwise),
+            "error": str (last error, if failure),
+            "attempts": int (repairs made)
+        }
+    """
+    max_attempts = MAX_REPAIR_ATTEMPTS if max_attempts is None else max_attempts
+    deadline = time.monotonic() + (REPAIR_DEADLINE_S if deadline_s is None else deadline_s)
+    engine = backend or get_backend()
+
+    attempt = 0
+    result = check_sql(sql, engine)
+    _record(attempt, result["success"])
+
+    while not result["success"] and attempt < max_attempts:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or sql.startswith("-- ERROR"):
+            break  # out of time, or the LLM itself is failing
+
+        attempt += 1
+        sql = repair_sql_with_llm(question, sql, result["error"], erd, timeout=remaining)
+        result = check_sql(sql, engine)
+        _record(attempt, result["success"])
+
+    if result["success"]:
+        return {"success": True, "sql": result["formatted_sql"], "attempts": attempt}
+
+    return {"success": False, "sql": sql, "error": result["error"], "attempts": attempt}
@@ -4,9 +4,13 @@
 import sqlglot
 from sqlglot import parse_one, transpile, errors
 
-def validate_and_format_sql(sql_query: str) -> dict:
+# 🗣️ Dialect the LLM tends to write in (source for transpilation)
+SOURCE_DIALECT = "mysql"
+
+def validate_and_format_sql(sql_query: str, dialect: str = "duckdb") -> dict:
     """
-    Validate, format, and optionally transpile SQL to DuckDB dialect.
+    Validate, format, and transpile SQL to the target engine's dialect.
+    Pass the execution backend's `dialect` (e.g. "duckdb", "sqlite").
     
     Returns:
         {
@@ -19,14 +23,14 @@ def validate_and_format_sql(sql_query: str) -> dict:
         # 1. Parse the SQL (catch obvious syntax errors)
         parsed = parse_one(sql_query)
         
-        # 2. Optional: transpile/correct to DuckDB dialect
-        transpiled = transpile(sql_query, read="mysql", write="duckdb")
+        # 2. Transpile/correct to the target dialect
+        transpiled = transpile(sql_query, read=SOURCE_DIALECT, write=dialect)
         
         # 3. Format nicely
         formatted_sql = sqlglot.transpile(
             transpiled[0], 
-            read="duckdb", 
-            write="duckdb", 
+            read=dialect, 
+            write=dialect, 
             pretty=True
         )[0]
 
@@ -45,3 +49,26 @@ def validate_and_format_sql(sql_query: str) -> dict:
             "success": False,
             "error": f"Unknown Error: {str(e)}"
         }
+
+def validate_joins(sql_query: str, join_graph, dialect: str = "duckdb") -> dict:
+    """
+    Check the join conditions of a query (ON, USING and WHERE equalities)
+    against the ERD join graph.
+    
+    Returns:
+        {
+            "success": bool,
+            "issues": list[str]     (empty if joins match the ERD),
+            "unchecked": list[str]  (joins that could not be verified)
+        }
+    """
+    try:
+        result = join_graph.check_joins(sql_query, dialect=dialect)
+    except errors.ParseError as e:
+        return {"success": False, "issues": [f"ParseError: {str(e)}"], "unchecked": []}
+
+    return {
+        "success": not result["issues"],
+        "issues": result["issues"],
+        "unchecked": result["unchecked"]
+    }
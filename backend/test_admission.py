@@ -0,0 +1,132 @@
+# test_admission.py
+
+"""
+🧪 LLM admission control checks
+-------------------------------
+Run directly (python test_admission.py) or via pytest.
+Worker threads stand in for LLM calls, so Ollama is not needed.
+"""
+
+import threading
+import time
+
+from admission import AdmissionController, QueueFull, ShedLoad
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition never met"
+        time.sleep(0.01)
+
+
+class Workers:
+    """Threads that each hold a slot until release() is called."""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.gate = threading.Event()
+        self.order, self.errors, self.threads = [], [], []
+
+    def start(self, name, priority):
+        def run():
+            try:
+                with self.controller.slot(priority):
+                    self.order.append(name)
+                    self.gate.wait(5)
+            except (QueueFull, ShedLoad) as e:
+                self.errors.append((name, type(e).__name__))
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+
+    def release(self):
+        self.gate.set()
+        for thread in self.threads:
+            thread.join(5)
+
+
+def test_interactive_served_before_batch():
+    controller = AdmissionController(concurrency=1, max_queue=4, max_wait_s=10, initial_latency_s=0.1)
+    workers = Workers(controller)
+
+    workers.start("running", "batch")
+    wait_for(lambda: controller.stats()["active"] == 1)
+    workers.start("batch", "batch")
+    wait_for(lambda: controller.stats()["queue_depth"] == 1)
+    workers.start("interactive", "interactive")
+    wait_for(lambda: controller.stats()["queue_depth"] == 2)
+
+    workers.release()
+    assert workers.order == ["running", "interactive", "batch"]
+
+
+def test_full_queue_rejects_and_interactive_bumps_batch():
+    controller = AdmissionController(concurrency=1, max_queue=2, max_wait_s=10, initial_latency_s=0.1)
+    workers = Workers(controller)
+
+    workers.start("running", "batch")
+    wait_for(lambda: controller.stats()["active"] == 1)
+    for name in ("batch-1", "batch-2"):
+        workers.start(name, "batch")
+        wait_for(lambda: controller.stats()["queue_depth"] == int(name[-1]))
+
+    # Another batch job is turned away with a Retry-After hint
+    try:
+        with controller.slot("batch"):
+            pass
+        raise AssertionError("expected QueueFull")
+    except QueueFull as e:
+        assert e.retry_after >= 1
+
+    # An interactive request takes the newest batch job's place instead
+    workers.start("interactive", "interactive")
+    wait_for(lambda: workers.errors)
+    assert workers.errors == [("batch-2", "QueueFull")]
+
+    workers.release()
+    assert workers.order == ["running", "interactive", "batch-1"]
+    assert controller.stats()["rejected"] == 2
+
+
+def test_sheds_when_estimated_wait_too_long():
+    controller = AdmissionController(concurrency=1, max_queue=8, max_wait_s=1, initial_latency_s=5)
+    workers = Workers(controller)
+
+    workers.start("running", "interactive")
+    wait_for(lambda: controller.stats()["active"] == 1)
+    try:
+        with controller.slot("interactive"):
+            pass
+        raise AssertionError("expected ShedLoad")
+    except ShedLoad as e:
+        assert e.estimated_wait == 5
+
+    workers.release()
+    assert controller.stats()["shed"] == 1
+
+
+def test_latency_learned_from_successful_calls_only():
+    controller = AdmissionController(concurrency=1, initial_latency_s=1.0, smoothing=0.5)
+
+    try:
+        with controller.slot():
+            raise RuntimeError("LLM down")
+    except RuntimeError:
+        pass
+    assert controller.avg_latency_s == 1.0
+
+    with controller.slot():
+        time.sleep(0.05)
+    assert 0.5 < controller.avg_latency_s < 0.6
+    assert controller.stats()["active"] == 0
+
+
+if __name__ == "__main__":
+    print("🔍 Checking LLM admission control...")
+    test_interactive_served_before_batch()
+    test_full_queue_rejects_and_interactive_bumps_batch()
+    test_sheds_when_estimated_wait_too_long()
+    test_latency_learned_from_successful_calls_only()
+    print("✅ Queue ordering, rejection, shedding and latency learning behave as expected")
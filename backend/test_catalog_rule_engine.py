@@ -0,0 +1,108 @@
+# test_catalog_rule_engine.py
+
+"""
+🧪 Catalog value matching + rule engine filter checks
+-----------------------------------------------------
+Run directly (python test_catalog_rule_engine.py) or via pytest.
+Profiles an in-memory DuckDB and uses an inline ERD, so no data load
+or metadata files are needed.
+"""
+
+import duckdb
+
+from catalog_profiler import CatalogIndex, profile_table
+from join_planner import JoinGraph
+from rule_engine import rule_based_sql
+
+ERD = {
+    "dim_campaign": {"columns": ["campaign_id", "campaign_name", "channel"]},
+    "dim_customer": {"columns": ["customer_id", "customer_name", "email", "region"]},
+    "fact_message_event": {
+        "columns": ["message_id", "campaign_id", "customer_id"],
+        "joins": [
+            {"table": "dim_campaign", "on": "campaign_id"},
+            {"table": "dim_customer", "on": "customer_id"},
+        ],
+    },
+}
+
+
+def build_catalog() -> CatalogIndex:
+    con = duckdb.connect()
+    con.execute(
+        "CREATE TABLE dim_campaign AS SELECT * FROM (VALUES "
+        "(1, 'Spring Sale', 'Email'), (2, 'Summer Promo', 'Email'), "
+        "(3, 'Launch', 'Podcast'), (4, 'Winter Deals', 'Podcast')"
+        ") t(campaign_id, campaign_name, channel)"
+    )
+    con.execute(
+        "CREATE TABLE dim_customer AS SELECT * FROM (VALUES "
+        "(1, 'Ann', 'ann@example.com', 'North'), (2, 'Bob', 'bob@example.com', 'North'), "
+        "(3, 'Cy', 'cy@example.com', 'South'), (4, 'Di', 'di@example.com', 'South')"
+        ") t(customer_id, customer_name, email, region)"
+    )
+    tables = {table: profile_table(con, table) for table in ("dim_campaign", "dim_customer")}
+    con.close()
+    return CatalogIndex({"tables": tables})
+
+
+def test_profile_skips_unique_and_pii_columns():
+    catalog = build_catalog()
+
+    assert catalog.column_stats("dim_campaign", "channel")["categorical"]
+    assert catalog.column_stats("dim_customer", "region")["categorical"]
+    for column in ("customer_name", "email"):
+        stats = catalog.column_stats("dim_customer", column)
+        assert not stats["categorical"] and "values" not in stats
+    assert not catalog.column_stats("dim_campaign", "campaign_name")["categorical"]
+
+
+def test_match_values_tolerates_plurals():
+    catalog = build_catalog()
+
+    assert catalog.match_values("podcasts in the south") == [
+        {"table": "dim_campaign", "column": "channel", "value": "Podcast"},
+        {"table": "dim_customer", "column": "region", "value": "South"},
+    ]
+    assert catalog.match_values("Ann") == []  # names are not categorical
+
+
+def test_rule_sql_uses_catalog_values_as_filters():
+    catalog = build_catalog()
+    graph = JoinGraph(ERD)
+
+    assert rule_based_sql("email campaigns", ERD, graph, catalog) == (
+        "SELECT * FROM dim_campaign WHERE channel = 'Email';"
+    )
+    assert rule_based_sql("email and podcast campaigns", ERD, graph, catalog) == (
+        "SELECT * FROM dim_campaign WHERE channel IN ('Email', 'Podcast');"
+    )
+    assert rule_based_sql("podcast campaigns for customers in the north", ERD, graph, catalog) == (
+        "SELECT *\n"
+        "FROM fact_message_event\n"
+        "JOIN dim_campaign ON fact_message_event.campaign_id = dim_campaign.campaign_id\n"
+        "JOIN dim_customer ON fact_message_event.customer_id = dim_customer.customer_id\n"
+        "WHERE dim_campaign.channel = 'Podcast' AND dim_customer.region = 'North';"
+    )
+
+
+def test_rule_sql_keeps_column_the_question_points_at():
+    catalog = build_catalog()
+    graph = JoinGraph(ERD)
+
+    # "email" is a dim_customer column and a channel value; "customers" decides
+    assert rule_based_sql("show email of customers", ERD, graph, catalog) == (
+        "SELECT * FROM dim_customer WHERE email IS NOT NULL;"
+    )
+    assert rule_based_sql("customers in the south with email", ERD, graph, catalog) == (
+        "SELECT * FROM dim_customer WHERE region = 'South' AND email IS NOT NULL;"
+    )
+
+
+if __name__ == "__main__":
+    print("🔍 Checking catalog value matching and rule-based filters...")
+    test_profile_skips_unique_and_pii_columns()
+    test_match_values_tolerates_plurals()
+    test_rule_sql_uses_catalog_values_as_filters()
+    test_rule_sql_keeps_column_the_question_points_at()
+    print("✅ Catalog values become the expected rule-based filters")
@@ -0,0 +1,46 @@
+# test_db_backends.py
+
+"""
+🧪 Execution backend checks
+---------------------------
+Run directly (python test_db_backends.py) or via pytest.
+Uses an in-memory DuckDB, so no data load is needed.
+"""
+
+import threading
+import time
+
+from db_backends import DuckDBBackend, QueryCancelled
+
+
+def test_duckdb_cancel_raises_query_cancelled():
+    backend = DuckDBBackend(path=":memory:")
+    errors = []
+
+    def run_long_query():
+        try:
+            backend.execute("SELECT COUNT(*) FROM range(10000000000)", query_id="long")
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=run_long_query)
+    worker.start()
+
+    # Wait for the query to be in flight, then cancel it
+    deadline = time.monotonic() + 5
+    while not backend.cancel("long"):
+        assert time.monotonic() < deadline, "query never started"
+        time.sleep(0.05)
+
+    worker.join(timeout=5)
+    assert not worker.is_alive(), "query still running after cancel()"
+    assert len(errors) == 1 and isinstance(errors[0], QueryCancelled)
+    assert backend.stats()["cancelled"] == 1
+
+    backend.close()
+
+
+if __name__ == "__main__":
+    print("🔍 Cancelling a long DuckDB query...")
+    test_duckdb_cancel_raises_query_cancelled()
+    print("✅ Cancelled query raised QueryCancelled")
@@ -0,0 +1,99 @@
+# test_join_planner.py
+
+"""
+🧪 Join planner checks
+----------------------
+Run directly (python test_join_planner.py) or via pytest.
+Uses a small inline ERD, so no metadata files are needed.
+"""
+
+from join_planner import JoinGraph
+
+ERD = {
+    "dim_campaign": {"columns": ["campaign_id", "channel"]},
+    "dim_customer": {"columns": ["customer_id", "region"]},
+    "fact_message_event": {
+        "columns": ["message_id", "campaign_id", "customer_id"],
+        "joins": [
+            {"table": "dim_campaign", "on": "campaign_id"},
+            {"table": "dim_customer", "on": "customer_id"},
+        ],
+    },
+    "dim_orphan": {"columns": ["orphan_id"]},
+}
+
+
+def test_paths_follow_erd_joins():
+    graph = JoinGraph(ERD)
+
+    assert graph.join_key("dim_campaign", "fact_message_event") == "campaign_id"
+    assert graph.path("dim_campaign", "dim_campaign") == []
+    assert graph.path("dim_campaign", "dim_customer") == [
+        ("dim_campaign", "fact_message_event", "campaign_id"),
+        ("fact_message_event", "dim_customer", "customer_id"),
+    ]
+    assert graph.path("dim_campaign", "dim_orphan") is None
+
+    # Two dimensions are joined through the fact table linking them
+    assert graph.default_base(["dim_campaign", "dim_customer"]) == "fact_message_event"
+    assert graph.from_clause(["dim_campaign", "dim_customer"]) == (
+        "FROM fact_message_event\n"
+        "JOIN dim_campaign ON fact_message_event.campaign_id = dim_campaign.campaign_id\n"
+        "JOIN dim_customer ON fact_message_event.customer_id = dim_customer.customer_id"
+    )
+
+
+def test_check_joins_on_clause():
+    graph = JoinGraph(ERD)
+
+    ok = graph.check_joins(
+        "SELECT * FROM fact_message_event m JOIN dim_campaign c ON m.campaign_id = c.campaign_id"
+    )
+    assert ok == {"issues": [], "unchecked": []}
+
+    wrong_key = graph.check_joins(
+        "SELECT * FROM fact_message_event m JOIN dim_campaign c ON m.customer_id = c.campaign_id"
+    )
+    assert len(wrong_key["issues"]) == 1 and "join on campaign_id" in wrong_key["issues"][0]
+
+    not_related = graph.check_joins(
+        "SELECT * FROM dim_campaign c JOIN dim_customer u ON c.campaign_id = u.customer_id"
+    )
+    assert len(not_related["issues"]) == 1 and "not directly related" in not_related["issues"][0]
+
+
+def test_check_joins_using_and_implicit():
+    graph = JoinGraph(ERD)
+
+    using_ok = graph.check_joins("SELECT * FROM fact_message_event JOIN dim_customer USING (customer_id)")
+    assert using_ok == {"issues": [], "unchecked": []}
+
+    using_wrong = graph.check_joins("SELECT * FROM fact_message_event JOIN dim_customer USING (campaign_id)")
+    assert len(using_wrong["issues"]) == 1 and "USING (campaign_id)" in using_wrong["issues"][0]
+
+    implicit = graph.check_joins(
+        "SELECT * FROM fact_message_event m, dim_campaign c "
+        "WHERE m.campaign_id = c.campaign_id AND c.channel = 'Email'"
+    )
+    assert implicit == {"issues": [], "unchecked": []}
+
+
+def test_check_joins_reports_unchecked_tables():
+    graph = JoinGraph(ERD)
+
+    result = graph.check_joins("SELECT * FROM fact_message_event CROSS JOIN dim_campaign")
+    assert result["issues"] == []
+    assert len(result["unchecked"]) == 2
+    assert any("dim_campaign" in note for note in result["unchecked"])
+
+    # A single table has nothing to check
+    assert graph.check_joins("SELECT * FROM dim_campaign") == {"issues": [], "unchecked": []}
+
+
+if __name__ == "__main__":
+    print("🔍 Checking join paths and join validation...")
+    test_paths_follow_erd_joins()
+    test_check_joins_on_clause()
+    test_check_joins_using_and_implicit()
+    test_check_joins_reports_unchecked_tables()
+    print("✅ Join planner behaves as expected")
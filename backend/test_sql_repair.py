@@ -0,0 +1,101 @@
+# test_sql_repair.py
+
+"""
+🧪 SQL repair loop checks
+-------------------------
+Run directly (python test_sql_repair.py) or via pytest.
+Uses an in-memory DuckDB and a stubbed LLM, so neither a data load
+nor Ollama is needed.
+"""
+
+import time
+from contextlib import contextmanager
+
+import sql_repair
+from db_backends import DuckDBBackend
+
+BROKEN_SQL = "SELECT channl FROM dim_campaign"
+FIXED_SQL = "SELECT channel FROM dim_campaign"
+
+
+def make_backend():
+    backend = DuckDBBackend(path=":memory:")
+    backend.execute("CREATE TABLE dim_campaign (campaign_id INTEGER, channel VARCHAR)")
+    return backend
+
+
+@contextmanager
+def stub_repair(replies, delay_s=0.0):
+    """Replace the LLM repair call; records the timeout of every call made."""
+    calls = []
+
+    def fake_repair(question, sql, error, erd, timeout=None):
+        calls.append(timeout)
+        time.sleep(delay_s)
+        return replies[min(len(calls), len(replies)) - 1]
+
+    original = sql_repair.repair_sql_with_llm
+    sql_repair.repair_sql_with_llm = fake_repair
+    try:
+        yield calls
+    finally:
+        sql_repair.repair_sql_with_llm = original
+
+
+def test_repair_fixes_sql_from_database_error():
+    backend = make_backend()
+    with stub_repair([FIXED_SQL]) as calls:
+        result = sql_repair.generate_with_repair("channels", BROKEN_SQL, {}, backend=backend, max_attempts=2)
+
+    assert result["success"] and result["attempts"] == 1
+    assert "channel" in result["sql"]
+    assert len(calls) == 1
+    backend.close()
+
+
+def test_repair_stops_at_attempt_budget():
+    backend = make_backend()
+    with stub_repair([BROKEN_SQL]) as calls:
+        result = sql_repair.generate_with_repair("channels", BROKEN_SQL, {}, backend=backend, max_attempts=2)
+
+    assert not result["success"] and result["attempts"] == 2
+    assert len(calls) == 2
+    assert "channl" in result["error"]
+    backend.close()
+
+
+def test_repair_stops_at_deadline():
+    backend = make_backend()
+
+    # No time left: no repair is attempted at all
+    with stub_repair([FIXED_SQL]) as calls:
+        result = sql_repair.generate_with_repair("channels", BROKEN_SQL, {}, backend=backend,
+                                                 max_attempts=5, deadline_s=0)
+    assert not result["success"] and result["attempts"] == 0 and calls == []
+
+    # A slow repair uses up the deadline, so no second attempt follows
+    with stub_repair([BROKEN_SQL], delay_s=0.2) as calls:
+        result = sql_repair.generate_with_repair("channels", BROKEN_SQL, {}, backend=backend,
+                                                 max_attempts=5, deadline_s=0.1)
+    assert not result["success"] and result["attempts"] == 1
+    assert len(calls) == 1 and calls[0] <= 0.1  # the LLM call is bounded by what's left
+    backend.close()
+
+
+def test_repair_stops_when_llm_fails():
+    backend = make_backend()
+    with stub_repair(["-- ERROR: LLM unreachable (ConnectionError)"]) as calls:
+        result = sql_repair.generate_with_repair("channels", BROKEN_SQL, {}, backend=backend, max_attempts=5)
+
+    assert not result["success"] and result["attempts"] == 1
+    assert len(calls) == 1
+    backend.close()
+
+
+if __name__ == "__main__":
+    print("🔍 Checking the repair loop budget and deadline...")
+    test_repair_fixes_sql_from_database_error()
+    test_repair_stops_at_attempt_budget()
+    test_repair_stops_at_deadline()
+    test_repair_stops_when_llm_fails()
+    print("✅ Repair loop respects its attempt budget and deadline")
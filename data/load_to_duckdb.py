@@ -1,13 +1,20 @@
 # load_to_duckdb.py
 
 import os
+import sys
+import sqlite3
 import duckdb
 
+# Add backend folder to path to reuse the catalog profiler
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from catalog_profiler import profile_catalog
+
 # ----------------------------------
 # Setup paths
 # ----------------------------------
 DATA_DIR = os.path.dirname(__file__)
 DB_PATH = os.path.join(DATA_DIR, "marketing.db")
+SQLITE_PATH = os.path.join(DATA_DIR, "marketing.sqlite")
 
 # CSV file paths
 campaign_csv = os.path.join(DATA_DIR, "dim_campaign.csv")
@@ -71,8 +78,49 @@ print("✅ Loaded: dim_customer")
 con.execute(f"COPY fact_message_event FROM '{message_csv}' (HEADER, DELIMITER ',')")
 print("✅ Loaded: fact_message_event")
 
+# ----------------------------------
+# Profile catalog (only changed tables)
+# ----------------------------------
+
+print("📇 Profiling column statistics...")
+profile_catalog(con)
+
+# ----------------------------------
+# Mirror tables into SQLite (for side-by-side engine benchmarks)
+# ----------------------------------
+
+print(f"🪞 Copying tables to SQLite at {SQLITE_PATH}")
+sqlite_con = sqlite3.connect(SQLITE_PATH)
+
+for (table,) in con.execute(
+    "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main' ORDER BY table_name"
+).fetchall():
+    columns = con.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'main' AND table_name = ? ORDER BY ordinal_position",
+        [table]
+    ).fetchall()
+    column_defs = ", ".join(f'"{name}" {data_type}' for name, data_type in columns)
+
+    # Dates/timestamps are stored as ISO text, the SQLite convention
+    select_list = ", ".join(
+        f'"{name}"::VARCHAR' if data_type.startswith(("DATE", "TIMESTAMP", "TIME")) else f'"{name}"'
+        for name, data_type in columns
+    )
+    rows = con.execute(f'SELECT {select_list} FROM "{table}"').fetchall()
+
+    sqlite_con.execute(f'DROP TABLE IF EXISTS "{table}"')
+    sqlite_con.execute(f'CREATE TABLE "{table}" ({column_defs})')
+    sqlite_con.executemany(
+        f'INSERT INTO "{table}" VALUES ({", ".join("?" for _ in columns)})', rows
+    )
+    print(f"✅ Copied: {table} ({len(rows)} rows)")
+
+sqlite_con.commit()
+sqlite_con.close()
+
 # ----------------------------------
 # Wrap-up
 # ----------------------------------
 
-print("🎉 Done! Data loaded successfully into marketing.db")
+print("🎉 Done! Data loaded successfully into marketing.db (and marketing.sqlite)")
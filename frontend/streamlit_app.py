@@ -62,12 +62,20 @@ if question.strip() and not st.session_state.llm_sql:
     try:
         response = requests.post(
             "http://localhost:8000/generate_sql",
-            json={"question": question}
+            json={"question": question, "priority": "interactive"}
         )
-        data = response.json()
 
-        st.session_state.llm_sql = data.get("llm_sql", "")
-        st.session_state.original_question = question
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "a few")
+            st.warning(f"⏳ The SQL assistant is at capacity. Please try again in {retry_after} seconds.")
+        else:
+            data = response.json()
+
+            st.session_state.llm_sql = data.get("llm_sql", "")
+            st.session_state.original_question = question
+
+            if data.get("degraded"):
+                st.info(f"⏳ {data.get('validation_status', 'LLM busy')}")
 
     except Exception as e:
         st.error(f"🚨 Error contacting backend: {e}")